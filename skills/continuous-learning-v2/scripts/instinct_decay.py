@@ -5,38 +5,200 @@ Instincts without recent observations lose confidence over time.
 Those falling below the minimum threshold are archived.
 """
 
+import copy
 import json
+import os
+import re
 import sys
+import tempfile
+from collections import ChainMap
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
+
+INSTINCT_SUFFIXES = ('.yaml', '.yml', '.md')
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "config.json"
+SECONDS_PER_WEEK = 7 * 24 * 3600
+# A '---' line in an instinct body (whitespace allowed, as parse_fn strips)
+_DELIMITER_RE = re.compile(rb'^[ \t\r\f\v]*---[ \t\r\f\v]*$', re.MULTILINE)
+
+# Front matter written for every instinct; missing keys fall back to the
+# same defaults instinct-cli.py assumes when reading
+_HEADER_TMPL = (
+    "---\n"
+    "id: {id}\n"
+    'trigger: "{trigger}"\n'
+    "confidence: {confidence:.2f}\n"
+    "domain: {domain}\n"
+    "source: {source}\n"
+)
+_HEADER_DEFAULTS = {
+    'trigger': 'unknown',
+    'confidence': 0.5,
+    'domain': 'general',
+    'source': 'unknown',
+}
+# Trailing header lines, emitted only for keys the instinct has
+_OPTIONAL_HEADER_LINES = (
+    ('last_observed', 'last_observed: {}\n'),
+    ('observed_count', 'observed_count: {}\n'),
+    ('source_repo', 'source_repo: {}\n'),
+    ('imported_from', 'imported_from: {}\n'),
+)
+
+
+@lru_cache(maxsize=8)
+def _load_config_cached(path_str: str, mtime_ns: int) -> dict:
+    """Parse a config file; mtime_ns is part of the key so edits reload."""
+    return json.loads(Path(path_str).read_text())
 
 
 def _load_config() -> dict:
-    """Load config.json from the skill directory."""
-    config_path = Path(__file__).resolve().parent.parent / "config.json"
+    """Load config.json from the skill directory.
+
+    Returns a fresh copy each call so callers may modify it freely.
+    """
     try:
-        return json.loads(config_path.read_text())
+        cached = _load_config_cached(
+            str(CONFIG_PATH), CONFIG_PATH.stat().st_mtime_ns,
+        )
     except Exception:
         return {}
+    return copy.deepcopy(cached)
 
 
-def write_instinct_file(filepath: Path, instinct: dict) -> None:
-    """Write a single instinct dict back to its YAML-like file."""
-    output = "---\n"
-    for key in ['id', 'trigger', 'confidence', 'domain', 'source',
-                'last_observed', 'observed_count', 'source_repo',
-                'imported_from']:
+@lru_cache(maxsize=4096)
+def _parse_iso_ts(value: str) -> float:
+    """Parse an ISO timestamp to POSIX seconds (memoized, often shared)."""
+    return datetime.fromisoformat(value).timestamp()
+
+
+def _serialize_instinct(instinct: dict, body: Optional[str] = None) -> bytes:
+    """Render a single instinct dict in its YAML-like file format.
+
+    If body is given it follows the header verbatim; otherwise the
+    instinct's 'content' is rendered below a blank line.
+    """
+    parts = [_HEADER_TMPL.format_map(ChainMap(instinct, _HEADER_DEFAULTS))]
+    for key, line in _OPTIONAL_HEADER_LINES:
         if key in instinct:
-            value = instinct[key]
-            if key == 'trigger':
-                output += f'{key}: "{value}"\n'
-            elif key == 'confidence':
-                output += f'{key}: {value:.2f}\n'
-            else:
-                output += f'{key}: {value}\n'
-    output += "---\n\n"
-    output += instinct.get('content', '') + "\n"
-    filepath.write_text(output)
+            parts.append(line.format(instinct[key]))
+    parts.append("---\n")
+    if body is None:
+        body = "\n" + instinct.get('content', '') + "\n"
+    parts.append(body)
+    return "".join(parts).encode('utf-8')
+
+
+def _write_atomic(filepath: Path, data: bytes) -> None:
+    """Write data via a uniquely named sibling temp file and os.replace.
+
+    The temp file is removed if anything fails before the rename, and it
+    gets the target's existing permissions (or the umask default) rather
+    than the 0600 mode tempfile creates it with.
+    """
+    if filepath.exists():
+        mode = filepath.stat().st_mode & 0o777
+    else:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    tmp = tempfile.NamedTemporaryFile(
+        dir=filepath.parent, prefix=f".{filepath.name}.", suffix=".tmp",
+        delete=False,
+    )
+    tmp_path = Path(tmp.name)
+    try:
+        with tmp:
+            tmp.write(data)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def write_instinct_file(
+    filepath: Path,
+    instinct: dict,
+    body: Optional[str] = None,
+) -> None:
+    """Atomically write a single instinct dict to its YAML-like file.
+
+    Content goes to a temp file in the destination directory and is then
+    renamed over the target, so a crash never leaves a partial file.
+    """
+    _write_atomic(filepath, _serialize_instinct(instinct, body))
+
+
+def _read_front_matter(
+    filepath: Path,
+    parse_fn,
+) -> tuple[list[dict], Optional[str]]:
+    """Split an instinct file into its parsed front matter and raw body.
+
+    The header is read line by line and is all that goes through
+    parse_fn; the rest is taken in one read and returned verbatim so a
+    rewrite keeps it byte for byte. Decoding it here surfaces encoding
+    errors before anything is reported or written. If the body holds
+    further instinct blocks, the whole file is parsed instead and no body
+    is returned, so every block is decayed on its own.
+
+    Returns:
+        (instincts, body) where body is None for multi-instinct files.
+    """
+    header_lines = []
+    delimiters = 0
+    with filepath.open('rb') as f:
+        for line in iter(f.readline, b''):
+            header_lines.append(line)
+            if line.strip() == b'---':
+                delimiters += 1
+                if delimiters == 2:
+                    break
+        rest = f.read()
+    header = b"".join(header_lines).decode('utf-8')
+    body = rest.decode('utf-8')
+    # The substring test is a fast C-level prefilter for the regex
+    if b'---' in rest and _DELIMITER_RE.search(rest):
+        # A later delimiter may be a horizontal rule or another instinct
+        instincts = parse_fn(header + body)
+        if len(instincts) > 1:
+            return instincts, None
+    return parse_fn(header)[:1], body
+
+
+def _append_to_archive(dest: Path, data: bytes) -> None:
+    """Add archived instinct blocks to dest, keeping any already there.
+
+    A multi-instinct file can be archived one block per run, so an
+    existing archive file under the same name must not be replaced.
+    """
+    if dest.exists():
+        existing = dest.read_bytes()
+        if existing and not existing.endswith(b"\n"):
+            existing += b"\n"
+        data = existing + data
+    _write_atomic(dest, data)
+
+
+def _rewrite_multi_block_file(
+    src: Path,
+    blocks: list[dict],
+    archived_ids: set[int],
+    archived_dir: Path,
+) -> None:
+    """Rewrite a multi-instinct file, moving only its archived blocks."""
+    keep = [b for b in blocks if id(b) not in archived_ids]
+    gone = [b for b in blocks if id(b) in archived_ids]
+    if gone:
+        _append_to_archive(archived_dir / src.name,
+                           b"".join(_serialize_instinct(b) for b in gone))
+    if keep:
+        _write_atomic(src, b"".join(_serialize_instinct(b) for b in keep))
+    else:
+        src.unlink()
 
 
 def run_decay(
@@ -60,101 +222,133 @@ def run_decay(
     instincts_cfg = config.get('instincts', {})
     decay_rate = instincts_cfg.get('confidence_decay_rate', 0.02)
     min_confidence = instincts_cfg.get('min_confidence', 0.3)
-    now = datetime.now()
+    now_ts = datetime.now().timestamp()
 
     if not personal_dir.exists():
         print("No personal instincts directory found.")
         return 0
 
-    files = sorted(
-        set(personal_dir.glob("*.yaml"))
-        | set(personal_dir.glob("*.yml"))
-        | set(personal_dir.glob("*.md"))
-    )
+    # One directory scan instead of a glob per extension
+    with os.scandir(personal_dir) as entries:
+        files = sorted(
+            Path(entry.path) for entry in entries
+            if entry.is_file() and entry.name.endswith(INSTINCT_SUFFIXES)
+        )
     if not files:
         print("No personal instinct files found.")
         return 0
 
-    decayed = []
-    archived = []
+    # Parse phase: gather candidates and their inputs to the decay formula
+    pending = []
+    old_hundredths = []
+    weeks = []
+
+    # Instinct lists of files holding several blocks, rewritten as a whole
+    multi_block_files: dict[Path, list[dict]] = {}
 
     for filepath in files:
         try:
-            content = filepath.read_text()
-            parsed_list = parse_fn(content)
+            # Usually only the header is parsed; the body is kept verbatim
+            instincts, body = _read_front_matter(filepath, parse_fn)
         except Exception as e:
             print(f"Warning: Failed to parse {filepath}: {e}",
                   file=sys.stderr)
             continue
+        if body is None:
+            multi_block_files[filepath] = instincts
 
-        for inst in parsed_list:
+        for inst in instincts:
             last_obs_str = inst.get('last_observed')
             if not last_obs_str:
                 continue
 
             try:
-                last_obs = datetime.fromisoformat(last_obs_str)
+                last_obs_ts = _parse_iso_ts(last_obs_str)
             except ValueError:
                 continue
 
-            weeks_since = (now - last_obs).days / 7.0
+            weeks_since = (now_ts - last_obs_ts) / SECONDS_PER_WEEK
             if weeks_since <= 0:
                 continue
 
             old_conf = inst.get('confidence', 0.5)
-            new_conf = round(old_conf - (weeks_since * decay_rate), 4)
-            new_conf = max(new_conf, 0.0)
+            pending.append((filepath, inst, old_conf, body))
+            old_hundredths.append(int(round(old_conf * 100)))
+            weeks.append(weeks_since)
 
-            if new_conf == old_conf:
-                continue
+    # Decay phase: one tight elementwise pass over the collected inputs.
+    # Confidences are written with two decimals, so work in integer
+    # hundredths and skip float rounding entirely.
+    decay_hundredths = decay_rate * 100
+    min_hundredths = int(round(min_confidence * 100))
+    new_hundredths = [
+        max(old_i - int(w * decay_hundredths + 0.5), 0)
+        for old_i, w in zip(old_hundredths, weeks)
+    ]
 
-            if new_conf < min_confidence:
-                archived.append({
-                    'file': filepath,
-                    'instinct': inst,
-                    'old': old_conf,
-                    'new': new_conf,
-                })
-            else:
-                decayed.append({
-                    'file': filepath,
-                    'instinct': inst,
-                    'old': old_conf,
-                    'new': new_conf,
-                })
+    decayed: list[dict] = []
+    archived: list[dict] = []
+    for (filepath, inst, old_conf, body), old_i, new_i in zip(
+        pending, old_hundredths, new_hundredths,
+    ):
+        if new_i == old_i:
+            continue
+        target = archived if new_i < min_hundredths else decayed
+        target.append({
+            'file': filepath,
+            'instinct': inst,
+            'old': old_conf,
+            'new': new_i / 100.0,
+            'body': body,
+        })
 
     if not decayed and not archived:
         print("No instincts need decay.")
         return 0
 
+    # Build each report section and emit it with a single write
     if decayed:
-        print(f"\nDECAYED ({len(decayed)}):")
+        lines = [f"\nDECAYED ({len(decayed)}):"]
         for item in decayed:
             iid = item['instinct'].get('id', 'unnamed')
-            print(f"  {iid}: {item['old']:.2f} -> {item['new']:.2f}")
+            lines.append(f"  {iid}: {item['old']:.2f} -> {item['new']:.2f}")
+        sys.stdout.write("\n".join(lines) + "\n")
 
     if archived:
-        print(f"\nARCHIVED (below {min_confidence}) ({len(archived)}):")
+        lines = [f"\nARCHIVED (below {min_confidence}) ({len(archived)}):"]
         for item in archived:
             iid = item['instinct'].get('id', 'unnamed')
-            print(f"  {iid}: {item['old']:.2f} -> {item['new']:.2f}")
+            lines.append(f"  {iid}: {item['old']:.2f} -> {item['new']:.2f}")
+        sys.stdout.write("\n".join(lines) + "\n")
 
     if dry_run:
         print("\n[DRY RUN] No changes made.")
         return 0
 
-    for item in decayed:
-        inst = item['instinct']
-        inst['confidence'] = item['new']
-        write_instinct_file(item['file'], inst)
-
-    for item in archived:
-        src = item['file']
-        dest = archived_dir / src.name
-        inst = item['instinct']
-        inst['confidence'] = item['new']
-        write_instinct_file(dest, inst)
-        src.unlink()
+    for item in decayed + archived:
+        item['instinct']['confidence'] = item['new']
+    archived_ids = {id(item['instinct']) for item in archived}
+
+    rewritten = set()
+    for is_archived, items in ((False, decayed), (True, archived)):
+        for item in items:
+            src = item['file']
+            if src in multi_block_files:
+                if src not in rewritten:
+                    rewritten.add(src)
+                    _rewrite_multi_block_file(
+                        src, multi_block_files[src], archived_ids,
+                        archived_dir,
+                    )
+            elif is_archived:
+                # Write straight into the archive, then drop the source
+                _append_to_archive(
+                    archived_dir / src.name,
+                    _serialize_instinct(item['instinct'], item['body']),
+                )
+                src.unlink()
+            else:
+                write_instinct_file(src, item['instinct'], item['body'])
 
     print(f"\nDone: {len(decayed)} decayed, {len(archived)} archived.")
     return 0
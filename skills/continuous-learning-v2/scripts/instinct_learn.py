@@ -7,86 +7,190 @@ Detects patterns from observations.jsonl:
   - Error fixes: Bash failure followed by an edit
 """
 
-import json
+import importlib.util
 import re
+import sys
 from collections import defaultdict, Counter
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from types import ModuleType
+from typing import Optional, TypedDict, cast
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads  # type: ignore[assignment]
 
-def _load_observations(obs_path: Path) -> list[dict]:
+# Upper bound on windows counted per session for each window size
+MAX_SEQ_WINDOWS = 50_000
+
+_INTERNED_KEYS = ('tool', 'event', 'session')
+_CORRECTION_TOOLS = frozenset(('Edit', 'Write'))
+_SEQ_ID_RE = re.compile(r'[^a-z0-9]+')
+_ERROR_RE = re.compile(
+    r'error|failed|traceback|exception|exit code', re.IGNORECASE,
+)
+
+
+def _load_sibling(name: str) -> ModuleType:
+    """Load a script from this directory by file path.
+
+    Like the tests, this avoids depending on the scripts directory being
+    on sys.path.
+    """
+    path = Path(__file__).resolve().with_name(f"{name}.py")
+    spec = importlib.util.spec_from_file_location(name, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load {path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# Shared instinct file writer, so new and decayed files use one header
+_decay = _load_sibling("instinct_decay")
+
+
+class Observation(TypedDict, total=False):
+    """One line of observations.jsonl, as written by the observe hook."""
+    timestamp: str
+    event: str
+    tool: str
+    input: str
+    output: str
+    session: str
+    session_id: str
+
+
+def _load_observations(obs_path: Path) -> list[Observation]:
     """Load observations from JSONL file."""
     if not obs_path.exists():
         return []
-    observations = []
-    for line in obs_path.read_text().splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        try:
-            observations.append(json.loads(line))
-        except json.JSONDecodeError:
-            continue
+    observations: list[Observation] = []
+    # Stream raw bytes line by line; both decoders accept bytes directly
+    with obs_path.open('rb', buffering=1 << 20) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                obs = _json_loads(line)
+            except ValueError:
+                # Covers JSONDecodeError from either decoder and bad UTF-8
+                continue
+            if not isinstance(obs, dict):
+                # Valid JSON but not an observation object
+                continue
+            # The same few names repeat on every line; intern them so
+            # tuple hashing and Counter lookups hit the identity path
+            for key in _INTERNED_KEYS:
+                value = obs.get(key)
+                if type(value) is str:
+                    obs[key] = sys.intern(value)
+            observations.append(cast(Observation, obs))
     return observations
 
 
-def _group_by_session(observations: list[dict]) -> dict[str, list[dict]]:
+def _group_by_session(
+    observations: list[Observation],
+) -> dict[str, list[Observation]]:
     """Group observations by session ID."""
-    sessions = defaultdict(list)
+    sessions: defaultdict[str, list[Observation]] = defaultdict(list)
     for obs in observations:
         sid = obs.get('session', obs.get('session_id', 'unknown'))
         sessions[sid].append(obs)
     return dict(sessions)
 
 
-def _detect_user_corrections(session_obs: list[dict]) -> list[dict]:
-    """Detect user corrections: same tool used consecutively, rewriting."""
-    candidates = []
-    for i in range(1, len(session_obs)):
-        prev = session_obs[i - 1]
-        curr = session_obs[i]
-        if prev.get('tool') != curr.get('tool'):
-            continue
-        if prev.get('tool') not in ('Edit', 'Write'):
+def _scan_session(
+    session_obs: list[Observation],
+) -> tuple[list[dict], list[str]]:
+    """Walk a session once, detecting per-session patterns.
+
+    Returns:
+        (candidates, tools) where candidates holds user-correction and
+        error-fix candidates (each id at most once) and tools is the
+        tool_start sequence used for repeated-workflow detection.
+    """
+    candidates: list[dict] = []
+    seen_ids: set[str] = set()
+    tools: list[str] = []
+    prev = None
+    pt = None
+    for curr in session_obs:
+        ct = curr.get('tool')
+        if curr.get('event') == 'tool_start':
+            tools.append(curr.get('tool', ''))
+        if prev is None:
+            prev, pt = curr, ct
             continue
-        # Same tool, consecutive -> likely a correction
-        candidates.append({
-            'id': f"correction-{prev.get('tool', 'unknown').lower()}-pattern",
-            'trigger': f"when using {prev.get('tool', 'unknown')}",
-            'domain': 'workflow',
-            'pattern_type': 'user_correction',
-            'evidence': f"Consecutive {prev.get('tool')} calls detected",
-        })
-    return candidates
 
+        # Same tool, consecutive -> likely a correction. The membership
+        # test rejects most pairs, so it runs before the equality check.
+        if pt in _CORRECTION_TOOLS and pt == ct:
+            cid = f"correction-{pt.lower()}-pattern"
+            if cid not in seen_ids:
+                seen_ids.add(cid)
+                candidates.append({
+                    'id': cid,
+                    'trigger': f"when using {pt}",
+                    'domain': 'workflow',
+                    'pattern_type': 'user_correction',
+                    'evidence': f"Consecutive {pt} calls detected",
+                })
 
-def _detect_repeated_workflows(
-    sessions: dict[str, list[dict]],
+        # Bash complete with error indicator, followed by an edit
+        if (pt == 'Bash'
+                and ct in _CORRECTION_TOOLS
+                and prev.get('event') == 'tool_complete'
+                and 'error-then-fix-pattern' not in seen_ids):
+            if _ERROR_RE.search(str(prev.get('output', ''))):
+                seen_ids.add('error-then-fix-pattern')
+                candidates.append({
+                    'id': 'error-then-fix-pattern',
+                    'trigger': 'when a command fails',
+                    'domain': 'debugging',
+                    'pattern_type': 'error_fix',
+                    'evidence': f"Bash error followed by {ct}",
+                })
+
+        prev, pt = curr, ct
+    return candidates, tools
+
+
+def _workflow_candidates(
+    tool_sequences: list[list[str]],
     min_occurrences: int = 3,
 ) -> list[dict]:
-    """Detect repeated tool sequences across sessions."""
-    # Build tool sequences per session (use sliding windows of 3-5 tools)
-    seq_counter = Counter()
-    for session_obs in sessions.values():
-        tools = [o.get('tool', '') for o in session_obs
-                 if o.get('event') == 'tool_start']
+    """Detect repeated tool sequences across per-session tool lists."""
+    # Count sliding windows of 3-5 tools
+    seq_counter: Counter[tuple[str, ...]] = Counter()
+    for tools in tool_sequences:
+        if len(tools) < 3:
+            continue
+        # Bound the windows a single pathological session contributes
+        if len(tools) > MAX_SEQ_WINDOWS:
+            tools = tools[:MAX_SEQ_WINDOWS]
         for window_size in range(3, min(6, len(tools) + 1)):
-            for i in range(len(tools) - window_size + 1):
-                seq = tuple(tools[i:i + window_size])
-                seq_counter[seq] += 1
+            # zip over offset slices yields every window as a tuple
+            seq_counter.update(
+                zip(*(tools[k:] for k in range(window_size))),
+            )
 
-    candidates = []
+    candidates: list[dict] = []
+    seen_ids: set[str] = set()
     for seq, count in seq_counter.items():
         if count < min_occurrences:
             continue
+        seq_id = _SEQ_ID_RE.sub('-', "-".join(seq).lower()).strip('-')[:40]
+        cid = f"workflow-{seq_id}"
+        # Distinct sequences can slug to the same truncated id
+        if cid in seen_ids:
+            continue
+        seen_ids.add(cid)
         seq_str = " -> ".join(seq)
-        seq_id = re.sub(
-            r'[^a-z0-9]+', '-',
-            "-".join(s.lower() for s in seq),
-        ).strip('-')[:40]
         candidates.append({
-            'id': f"workflow-{seq_id}",
+            'id': cid,
             'trigger': f"when following {seq_str} workflow",
             'domain': 'workflow',
             'pattern_type': 'repeated_workflow',
@@ -96,32 +200,6 @@ def _detect_repeated_workflows(
     return candidates
 
 
-def _detect_error_fixes(session_obs: list[dict]) -> list[dict]:
-    """Detect error-fix patterns: Bash failure followed by Edit."""
-    candidates = []
-    for i in range(len(session_obs) - 1):
-        curr = session_obs[i]
-        nxt = session_obs[i + 1]
-        # Bash complete with error indicator
-        if curr.get('tool') != 'Bash' or curr.get('event') != 'tool_complete':
-            continue
-        output = str(curr.get('output', ''))
-        has_error = any(kw in output.lower()
-                        for kw in ['error', 'failed', 'traceback',
-                                   'exception', 'exit code'])
-        if not has_error:
-            continue
-        if nxt.get('tool') in ('Edit', 'Write'):
-            candidates.append({
-                'id': 'error-then-fix-pattern',
-                'trigger': 'when a command fails',
-                'domain': 'debugging',
-                'pattern_type': 'error_fix',
-                'evidence': f"Bash error followed by {nxt.get('tool')}",
-            })
-    return candidates
-
-
 def _deduplicate(
     candidates: list[dict],
     existing_instincts: list[dict],
@@ -132,7 +210,12 @@ def _deduplicate(
     Returns:
         (new_candidates, boosted_existing)
     """
-    existing_ids = {i.get('id') for i in existing_instincts}
+    # Index once; first occurrence wins, matching the previous linear scan
+    existing_by_id: dict[str, dict] = {}
+    for inst in existing_instincts:
+        iid = inst.get('id')
+        if iid:
+            existing_by_id.setdefault(iid, inst)
     new_candidates = []
     boosted = []
 
@@ -143,19 +226,16 @@ def _deduplicate(
             continue
         seen_ids.add(cid)
 
-        if cid in existing_ids:
+        existing = existing_by_id.get(cid)
+        if existing is not None:
             # Boost existing instinct confidence
-            existing = next(
-                (e for e in existing_instincts if e.get('id') == cid), None,
-            )
-            if existing:
-                old_conf = existing.get('confidence', 0.5)
-                new_conf = min(old_conf + confidence_boost, 1.0)
-                boosted.append({
-                    'instinct': existing,
-                    'old_confidence': old_conf,
-                    'new_confidence': new_conf,
-                })
+            old_conf = existing.get('confidence', 0.5)
+            new_conf = min(old_conf + confidence_boost, 1.0)
+            boosted.append({
+                'instinct': existing,
+                'old_confidence': old_conf,
+                'new_confidence': new_conf,
+            })
         else:
             new_candidates.append(cand)
 
@@ -192,10 +272,12 @@ def run_learn(
 
     # Detect patterns
     all_candidates = []
-    for sid, session_obs in sessions.items():
-        all_candidates.extend(_detect_user_corrections(session_obs))
-        all_candidates.extend(_detect_error_fixes(session_obs))
-    all_candidates.extend(_detect_repeated_workflows(sessions))
+    tool_sequences = []
+    for session_obs in sessions.values():
+        candidates, tools = _scan_session(session_obs)
+        all_candidates.extend(candidates)
+        tool_sequences.append(tools)
+    all_candidates.extend(_workflow_candidates(tool_sequences))
 
     if not all_candidates:
         print("No patterns detected.")
@@ -206,22 +288,24 @@ def run_learn(
         all_candidates, existing_instincts,
     )
 
-    # Print results
+    # Print results, one write per section
     if new_candidates:
-        print(f"\nNEW CANDIDATES ({len(new_candidates)}):")
+        lines = [f"\nNEW CANDIDATES ({len(new_candidates)}):"]
         for cand in new_candidates:
-            print(f"  + {cand['id']}")
-            print(f"    trigger: {cand.get('trigger', 'N/A')}")
-            print(f"    evidence: {cand.get('evidence', 'N/A')}")
-            print()
+            lines.append(f"  + {cand['id']}")
+            lines.append(f"    trigger: {cand.get('trigger', 'N/A')}")
+            lines.append(f"    evidence: {cand.get('evidence', 'N/A')}")
+            lines.append("")
+        sys.stdout.write("\n".join(lines) + "\n")
 
     if boosted:
-        print(f"BOOSTED ({len(boosted)}):")
+        lines = [f"BOOSTED ({len(boosted)}):"]
         for item in boosted:
             iid = item['instinct'].get('id', 'unnamed')
-            print(f"  ~ {iid}: "
-                  f"{item['old_confidence']:.2f} -> "
-                  f"{item['new_confidence']:.2f}")
+            lines.append(f"  ~ {iid}: "
+                         f"{item['old_confidence']:.2f} -> "
+                         f"{item['new_confidence']:.2f}")
+        sys.stdout.write("\n".join(lines) + "\n")
 
     if not execute:
         print("\n[PREVIEW] Use --execute to write instinct files.")
@@ -238,20 +322,20 @@ def run_learn(
         if filepath.exists():
             continue
 
-        content = "---\n"
-        content += f"id: {cid}\n"
-        content += f'trigger: "{cand.get("trigger", "unknown")}"\n'
-        content += f"confidence: {initial_confidence}\n"
-        content += f"domain: {cand.get('domain', 'general')}\n"
-        content += f"source: auto-learned\n"
-        content += f"last_observed: {now}\n"
-        content += f"observed_count: 1\n"
-        content += "---\n\n"
-        content += f"## Action\n\n"
-        content += f"Pattern: {cand.get('pattern_type', 'unknown')}\n\n"
-        content += f"## Evidence\n\n{cand.get('evidence', 'N/A')}\n"
-
-        filepath.write_text(content)
+        _decay.write_instinct_file(filepath, {
+            'id': cid,
+            'trigger': cand.get('trigger', 'unknown'),
+            'confidence': initial_confidence,
+            'domain': cand.get('domain', 'general'),
+            'source': 'auto-learned',
+            'last_observed': now,
+            'observed_count': 1,
+            'content': (
+                "## Action\n\n"
+                f"Pattern: {cand.get('pattern_type', 'unknown')}\n\n"
+                f"## Evidence\n\n{cand.get('evidence', 'N/A')}"
+            ),
+        })
         written += 1
 
     print(f"\nWrote {written} new instinct files to {personal_dir}")
@@ -2,11 +2,13 @@
 
 import importlib.util
 import os
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from unittest.mock import patch
 from types import SimpleNamespace
 
+import pytest
+
 # Load instinct-cli.py (hyphenated filename requires importlib)
 _spec = importlib.util.spec_from_file_location(
     "instinct_cli",
@@ -72,6 +74,33 @@ class TestDecayNormal:
         assert abs(parsed[0]['confidence'] - 0.78) < 0.01
 
 
+class TestDecayTimezoneAware:
+    """Test timestamps carrying a UTC offset are decayed, not rejected."""
+
+    def test_utc_suffix_decays(self, tmp_path):
+        personal = tmp_path / "personal"
+        personal.mkdir()
+        archived = tmp_path / "archived"
+        archived.mkdir()
+
+        last_obs = (datetime.now(timezone.utc) - timedelta(days=7))
+        _make_instinct_file(
+            personal, "test.yaml", "test-inst", 0.8,
+            last_observed=last_obs.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        )
+
+        with patch.object(_decay_mod, '_load_config', return_value={
+            'instincts': {
+                'confidence_decay_rate': 0.02,
+                'min_confidence': 0.3,
+            }
+        }):
+            run_decay(personal, archived, parse_instinct_file)
+
+        parsed = parse_instinct_file((personal / "test.yaml").read_text())
+        assert abs(parsed[0]['confidence'] - 0.78) < 0.01
+
+
 class TestDecayMultiWeek:
     """Test 4-week decay."""
 
@@ -100,6 +129,200 @@ class TestDecayMultiWeek:
         assert abs(parsed[0]['confidence'] - 0.82) < 0.01
 
 
+class TestDecayPreservesBody:
+    """Test decay rewrites only the header and keeps the body verbatim."""
+
+    def test_body_bytes_unchanged(self, tmp_path):
+        personal = tmp_path / "personal"
+        personal.mkdir()
+        archived = tmp_path / "archived"
+        archived.mkdir()
+
+        last_obs = (datetime.now() - timedelta(days=7)).isoformat()
+        body = "\n## Action\n\n  indented line\n\n## Evidence\n- one\n\n\n"
+        (personal / "test.yaml").write_text(
+            "---\n"
+            "id: test-inst\n"
+            'trigger: "when testing"\n'
+            "confidence: 0.8\n"
+            f"last_observed: {last_obs}\n"
+            "---\n" + body
+        )
+
+        with patch.object(_decay_mod, '_load_config', return_value={
+            'instincts': {
+                'confidence_decay_rate': 0.02,
+                'min_confidence': 0.3,
+            }
+        }):
+            run_decay(personal, archived, parse_instinct_file)
+
+        content = (personal / "test.yaml").read_text()
+        assert "confidence: 0.78\n" in content
+        assert content.endswith("---\n" + body)
+
+
+class TestDecayMultiBlockFile:
+    """Test files holding several instincts decay every block."""
+
+    def _decay(self, personal, archived):
+        with patch.object(_decay_mod, '_load_config', return_value={
+            'instincts': {
+                'confidence_decay_rate': 0.02,
+                'min_confidence': 0.3,
+            }
+        }):
+            run_decay(personal, archived, parse_instinct_file)
+
+    def test_archives_only_the_low_block(self, tmp_path):
+        personal = tmp_path / "personal"
+        personal.mkdir()
+        archived = tmp_path / "archived"
+        archived.mkdir()
+
+        last_obs = (datetime.now() - timedelta(days=28)).isoformat()
+        block = ("---\nid: {id}\nconfidence: {conf}\n"
+                 f"last_observed: {last_obs}\n---\n\n"
+                 "## Action\n{id} action\n\n")
+        (personal / "multi.yaml").write_text(
+            block.format(id="low-inst", conf=0.35)
+            + block.format(id="keep-inst", conf=0.9)
+        )
+
+        self._decay(personal, archived)
+
+        kept = parse_instinct_file((personal / "multi.yaml").read_text())
+        assert [i['id'] for i in kept] == ["keep-inst"]
+        assert abs(kept[0]['confidence'] - 0.82) < 0.01
+        assert kept[0]['content'] == "## Action\nkeep-inst action"
+
+        moved = parse_instinct_file((archived / "multi.yaml").read_text())
+        assert [i['id'] for i in moved] == ["low-inst"]
+        assert abs(moved[0]['confidence'] - 0.27) < 0.01
+
+    def test_blocks_archived_in_separate_runs_are_all_kept(self, tmp_path):
+        personal = tmp_path / "personal"
+        personal.mkdir()
+        archived = tmp_path / "archived"
+        archived.mkdir()
+
+        last_obs = (datetime.now() - timedelta(days=28)).isoformat()
+        block = ("---\nid: {id}\nconfidence: {conf}\n"
+                 f"last_observed: {last_obs}\n---\n\n"
+                 "## Action\n{id} action\n\n")
+        (personal / "multi.yaml").write_text(
+            block.format(id="a-inst", conf=0.35)
+            + block.format(id="b-inst", conf=0.40)
+        )
+
+        # Run 1: A drops to 0.27 and is archived, B stays at 0.32
+        self._decay(personal, archived)
+        moved = parse_instinct_file((archived / "multi.yaml").read_text())
+        assert [i['id'] for i in moved] == ["a-inst"]
+
+        # Run 2: B drops to 0.24 and joins A in the same archive file
+        self._decay(personal, archived)
+        assert not (personal / "multi.yaml").exists()
+        moved = parse_instinct_file((archived / "multi.yaml").read_text())
+        assert [i['id'] for i in moved] == ["a-inst", "b-inst"]
+        assert abs(moved[1]['confidence'] - 0.24) < 0.01
+
+    def test_horizontal_rule_keeps_body_verbatim(self, tmp_path):
+        personal = tmp_path / "personal"
+        personal.mkdir()
+        archived = tmp_path / "archived"
+        archived.mkdir()
+
+        last_obs = (datetime.now() - timedelta(days=7)).isoformat()
+        body = "\n## Action\nFirst part.\n\n---\n\nSecond part.\n"
+        (personal / "test.yaml").write_text(
+            "---\nid: test-inst\nconfidence: 0.8\n"
+            f"last_observed: {last_obs}\n---\n" + body
+        )
+
+        self._decay(personal, archived)
+
+        content = (personal / "test.yaml").read_text()
+        assert "confidence: 0.78\n" in content
+        assert content.endswith("---\n" + body)
+
+
+class TestDecayUndecodableBody:
+    """Test a file with a non-UTF-8 body is skipped before any write."""
+
+    def _setup(self, tmp_path):
+        personal = tmp_path / "personal"
+        personal.mkdir()
+        archived = tmp_path / "archived"
+        archived.mkdir()
+
+        last_obs = (datetime.now() - timedelta(days=14)).isoformat()
+        _make_instinct_file(personal, "a.yaml", "a-inst", 0.8,
+                            last_observed=last_obs)
+        (personal / "b.yaml").write_bytes(
+            "---\n"
+            "id: b-inst\n"
+            "confidence: 0.8\n"
+            f"last_observed: {last_obs}\n"
+            "---\n\n## Evidence\n".encode('utf-8')
+            + "caf\u00e9\n".encode('latin-1')
+        )
+        return personal, archived
+
+    def _run(self, personal, archived, dry_run):
+        with patch.object(_decay_mod, '_load_config', return_value={
+            'instincts': {
+                'confidence_decay_rate': 0.02,
+                'min_confidence': 0.3,
+            }
+        }):
+            return run_decay(personal, archived, parse_instinct_file,
+                             dry_run=dry_run)
+
+    def test_dry_run_and_real_run_report_the_same(self, tmp_path, capsys):
+        personal, archived = self._setup(tmp_path)
+        original_b = (personal / "b.yaml").read_bytes()
+
+        assert self._run(personal, archived, dry_run=True) == 0
+        dry = capsys.readouterr()
+        assert self._run(personal, archived, dry_run=False) == 0
+        real = capsys.readouterr()
+
+        for captured in (dry, real):
+            assert "DECAYED (1):\n  a-inst: 0.80 -> 0.76\n" in captured.out
+            assert "b-inst" not in captured.out
+            assert "Failed to parse" in captured.err
+            assert "b.yaml" in captured.err
+        assert "confidence: 0.76" in (personal / "a.yaml").read_text()
+        assert (personal / "b.yaml").read_bytes() == original_b
+
+
+class TestDecayBelowPrecision:
+    """Test decay smaller than the stored precision leaves files alone."""
+
+    def test_one_day_leaves_file_unchanged(self, tmp_path):
+        personal = tmp_path / "personal"
+        personal.mkdir()
+        archived = tmp_path / "archived"
+        archived.mkdir()
+
+        # 1 day = 1/7 week * 0.02 = ~0.003, below the 0.01 written precision
+        last_obs = (datetime.now() - timedelta(days=1)).isoformat()
+        _make_instinct_file(personal, "test.yaml", "test-inst", 0.8,
+                            last_observed=last_obs)
+        original_content = (personal / "test.yaml").read_text()
+
+        with patch.object(_decay_mod, '_load_config', return_value={
+            'instincts': {
+                'confidence_decay_rate': 0.02,
+                'min_confidence': 0.3,
+            }
+        }):
+            run_decay(personal, archived, parse_instinct_file)
+
+        assert (personal / "test.yaml").read_text() == original_content
+
+
 class TestDecayArchive:
     """Test archiving when confidence drops below threshold."""
 
@@ -127,6 +350,76 @@ class TestDecayArchive:
         # Archived file should exist
         assert (archived / "low.yaml").exists()
 
+    def test_writes_leave_no_temp_files(self, tmp_path):
+        personal = tmp_path / "personal"
+        personal.mkdir()
+        archived = tmp_path / "archived"
+        archived.mkdir()
+
+        last_obs = (datetime.now() - timedelta(days=28)).isoformat()
+        _make_instinct_file(personal, "keep.yaml", "keep-inst", 0.9,
+                            last_observed=last_obs)
+        _make_instinct_file(personal, "low.yaml", "low-inst", 0.35,
+                            last_observed=last_obs)
+
+        with patch.object(_decay_mod, '_load_config', return_value={
+            'instincts': {
+                'confidence_decay_rate': 0.02,
+                'min_confidence': 0.3,
+            }
+        }):
+            run_decay(personal, archived, parse_instinct_file)
+
+        assert sorted(p.name for p in personal.iterdir()) == ["keep.yaml"]
+        assert sorted(p.name for p in archived.iterdir()) == ["low.yaml"]
+
+
+class TestWriteInstinctFile:
+    """Test the atomic instinct writer."""
+
+    def test_header_defaults_and_optional_keys(self, tmp_path):
+        target = tmp_path / "test.yaml"
+        _decay_mod.write_instinct_file(target, {
+            'id': 'x',
+            'confidence': 0.4,
+            'imported_from': 'team.yaml',
+            'content': 'body',
+        })
+        assert target.read_text() == (
+            "---\n"
+            "id: x\n"
+            'trigger: "unknown"\n'
+            "confidence: 0.40\n"
+            "domain: general\n"
+            "source: unknown\n"
+            "imported_from: team.yaml\n"
+            "---\n\nbody\n"
+        )
+
+    def test_failed_write_removes_temp_file(self, tmp_path):
+        target = tmp_path / "test.yaml"
+        target.write_text("original\n")
+
+        with patch.object(_decay_mod.os, 'replace',
+                          side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                _decay_mod.write_instinct_file(
+                    target, {'id': 'x', 'content': 'body'},
+                )
+
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["test.yaml"]
+        assert target.read_text() == "original\n"
+
+    def test_keeps_existing_permissions(self, tmp_path):
+        target = tmp_path / "test.yaml"
+        target.write_text("original\n")
+        target.chmod(0o640)
+
+        _decay_mod.write_instinct_file(target, {'id': 'x', 'content': 'b'})
+
+        assert target.stat().st_mode & 0o777 == 0o640
+        assert target.read_text().startswith("---\nid: x\n")
+
 
 class TestDecayDryRun:
     """Test dry-run mode does not modify files."""
@@ -155,6 +448,32 @@ class TestDecayDryRun:
         # File content should be unchanged
         assert (personal / "test.yaml").read_text() == original_content
 
+    def test_dry_run_reports_changes(self, tmp_path, capsys):
+        personal = tmp_path / "personal"
+        personal.mkdir()
+        archived = tmp_path / "archived"
+        archived.mkdir()
+
+        last_obs = (datetime.now() - timedelta(days=14)).isoformat()
+        _make_instinct_file(personal, "a.yaml", "a-inst", 0.8,
+                            last_observed=last_obs)
+        _make_instinct_file(personal, "b.yaml", "b-inst", 0.31,
+                            last_observed=last_obs)
+
+        with patch.object(_decay_mod, '_load_config', return_value={
+            'instincts': {
+                'confidence_decay_rate': 0.02,
+                'min_confidence': 0.3,
+            }
+        }):
+            run_decay(personal, archived, parse_instinct_file,
+                      dry_run=True)
+
+        out = capsys.readouterr().out
+        assert "\nDECAYED (1):\n  a-inst: 0.80 -> 0.76\n" in out
+        assert ("\nARCHIVED (below 0.3) (1):\n"
+                "  b-inst: 0.31 -> 0.27\n") in out
+
 
 class TestDecayNoLastObserved:
     """Test instinct without last_observed is skipped."""
@@ -180,3 +499,39 @@ class TestDecayNoLastObserved:
 
         # File should remain unchanged
         assert (personal / "test.yaml").read_text() == original_content
+
+
+class TestLoadConfig:
+    """Test config.json loading and caching."""
+
+    def test_reloads_when_file_changes(self, tmp_path):
+        config_path = tmp_path / "config.json"
+        config_path.write_text('{"instincts": {"min_confidence": 0.3}}')
+
+        with patch.object(_decay_mod, 'CONFIG_PATH', config_path):
+            first = _decay_mod._load_config()
+            assert first['instincts']['min_confidence'] == 0.3
+
+            config_path.write_text('{"instincts": {"min_confidence": 0.5}}')
+            os.utime(config_path,
+                     ns=(0, config_path.stat().st_mtime_ns + 1))
+            second = _decay_mod._load_config()
+
+        assert second['instincts']['min_confidence'] == 0.5
+
+    def test_mutating_result_does_not_leak(self, tmp_path):
+        config_path = tmp_path / "config.json"
+        config_path.write_text('{"instincts": {"min_confidence": 0.3}}')
+
+        with patch.object(_decay_mod, 'CONFIG_PATH', config_path):
+            config = _decay_mod._load_config()
+            config['instincts']['min_confidence'] = 0.9
+            config['extra'] = True
+            again = _decay_mod._load_config()
+
+        assert again == {'instincts': {'min_confidence': 0.3}}
+
+    def test_missing_file_returns_empty(self, tmp_path):
+        with patch.object(_decay_mod, 'CONFIG_PATH',
+                          tmp_path / "missing.json"):
+            assert _decay_mod._load_config() == {}
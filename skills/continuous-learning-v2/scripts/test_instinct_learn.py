@@ -3,8 +3,10 @@
 import importlib.util
 import json
 import os
+import sys
 import tempfile
 from pathlib import Path
+from unittest.mock import patch
 
 # Load instinct_learn module
 _learn_spec = importlib.util.spec_from_file_location(
@@ -15,9 +17,8 @@ _learn_mod = importlib.util.module_from_spec(_learn_spec)
 _learn_spec.loader.exec_module(_learn_mod)
 
 _load_observations = _learn_mod._load_observations
-_detect_repeated_workflows = _learn_mod._detect_repeated_workflows
-_detect_user_corrections = _learn_mod._detect_user_corrections
-_detect_error_fixes = _learn_mod._detect_error_fixes
+_workflow_candidates = _learn_mod._workflow_candidates
+_scan_session = _learn_mod._scan_session
 _deduplicate = _learn_mod._deduplicate
 _group_by_session = _learn_mod._group_by_session
 run_learn = _learn_mod.run_learn
@@ -30,42 +31,119 @@ def _write_observations(path, observations):
             f.write(json.dumps(obs) + '\n')
 
 
-class TestDetectRepeatedWorkflows:
+class TestModuleLoading:
+    """Test instinct_learn loads by file path without sibling imports."""
+
+    def test_loads_without_scripts_dir_on_sys_path(self):
+        scripts_dir = os.path.dirname(os.path.abspath(__file__))
+        clean_path = [p for p in sys.path
+                      if os.path.abspath(p or os.curdir) != scripts_dir]
+        modules = {k: v for k, v in sys.modules.items()
+                   if k != 'instinct_decay'}
+        with patch.object(sys, 'path', clean_path), \
+                patch.dict(sys.modules, modules, clear=True):
+            spec = importlib.util.spec_from_file_location(
+                "instinct_learn_isolated",
+                os.path.join(scripts_dir, "instinct_learn.py"),
+            )
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+        assert callable(module.run_learn)
+
+
+class TestLoadObservations:
+    """Test JSONL observation loading."""
+
+    def test_skips_blank_malformed_and_non_object_lines(self, tmp_path):
+        obs_path = tmp_path / "observations.jsonl"
+        obs_path.write_bytes(
+            b'{"tool": "Read", "event": "tool_start"}\n'
+            b'\n'
+            b'{not json\n'
+            b'\xff\xfe\n'
+            b'[1, 2]\n'
+            b'"just a string"\n'
+            b'{"tool": "Edit", "event": "tool_start"}\n'
+        )
+        result = _load_observations(obs_path)
+        assert [o['tool'] for o in result] == ['Read', 'Edit']
+
+    def test_interns_repeated_names(self, tmp_path):
+        obs_path = tmp_path / "observations.jsonl"
+        _write_observations(obs_path, [
+            {'tool': 'Read', 'event': 'tool_start', 'session': 's1'},
+            {'tool': 'Read', 'event': 'tool_start', 'session': 's1'},
+        ])
+        first, second = _load_observations(obs_path)
+        for key in ('tool', 'event', 'session'):
+            assert first[key] is second[key]
+
+    def test_missing_file_returns_empty(self, tmp_path):
+        assert _load_observations(tmp_path / "missing.jsonl") == []
+
+
+class TestWorkflowCandidates:
     """Test repeated workflow detection."""
 
     def test_detects_3_plus_occurrences(self):
-        sessions = {
-            's1': [
-                {'tool': 'Grep', 'event': 'tool_start'},
-                {'tool': 'Read', 'event': 'tool_start'},
-                {'tool': 'Edit', 'event': 'tool_start'},
-            ],
-            's2': [
-                {'tool': 'Grep', 'event': 'tool_start'},
-                {'tool': 'Read', 'event': 'tool_start'},
-                {'tool': 'Edit', 'event': 'tool_start'},
-            ],
-            's3': [
-                {'tool': 'Grep', 'event': 'tool_start'},
-                {'tool': 'Read', 'event': 'tool_start'},
-                {'tool': 'Edit', 'event': 'tool_start'},
-            ],
-        }
-        result = _detect_repeated_workflows(sessions, min_occurrences=3)
+        tool_sequences = [['Grep', 'Read', 'Edit']] * 3
+        result = _workflow_candidates(tool_sequences, min_occurrences=3)
         assert len(result) >= 1
         assert any('grep' in c['id'] for c in result)
 
     def test_ignores_below_threshold(self):
-        sessions = {
-            's1': [
-                {'tool': 'Grep', 'event': 'tool_start'},
-                {'tool': 'Read', 'event': 'tool_start'},
-                {'tool': 'Edit', 'event': 'tool_start'},
-            ],
-        }
-        result = _detect_repeated_workflows(sessions, min_occurrences=3)
+        tool_sequences = [['Grep', 'Read', 'Edit']]
+        result = _workflow_candidates(tool_sequences, min_occurrences=3)
         assert len(result) == 0
 
+    def test_counts_overlapping_windows_within_session(self):
+        tool_sequences = [['Grep', 'Read', 'Edit'] * 3]
+        result = _workflow_candidates(tool_sequences, min_occurrences=3)
+        by_id = {c['id']: c for c in result}
+        assert by_id['workflow-grep-read-edit']['occurrences'] == 3
+        assert 'workflow-read-edit-grep' not in by_id
+
+    def test_windows_capped_per_session(self):
+        tool_sequences = [['Grep', 'Read', 'Edit'] * 10]
+        with patch.object(_learn_mod, 'MAX_SEQ_WINDOWS', 9):
+            result = _workflow_candidates(tool_sequences, min_occurrences=1)
+        by_id = {c['id']: c for c in result}
+        # Only the first 9 tools are windowed: Grep-Read-Edit starts 3 times
+        assert by_id['workflow-grep-read-edit']['occurrences'] == 3
+
+
+class TestScanSession:
+    """Test the fused single-pass session scan."""
+
+    def test_collects_candidates_and_tools_in_one_pass(self):
+        session = [
+            {'tool': 'Bash', 'event': 'tool_start'},
+            {'tool': 'Bash', 'event': 'tool_complete',
+             'output': 'Build FAILED'},
+            {'tool': 'Edit', 'event': 'tool_start'},
+            {'tool': 'Edit', 'event': 'tool_complete'},
+            {'tool': 'Read', 'event': 'tool_start'},
+        ]
+        candidates, tools = _scan_session(session)
+        assert tools == ['Bash', 'Edit', 'Read']
+        assert {c['pattern_type'] for c in candidates} == {
+            'user_correction', 'error_fix',
+        }
+
+    def test_corrections_emit_each_id_once(self):
+        session = [{'tool': 'Edit'}] * 4 + [{'tool': 'Write'}] * 2
+        candidates, _ = _scan_session(session)
+        assert [c['id'] for c in candidates] == [
+            'correction-edit-pattern', 'correction-write-pattern',
+        ]
+
+    def test_error_fix_emitted_once(self):
+        failure = {'tool': 'Bash', 'event': 'tool_complete',
+                   'output': 'Traceback (most recent call last)'}
+        session = [failure, {'tool': 'Edit'}] * 3
+        candidates, _ = _scan_session(session)
+        assert [c['id'] for c in candidates] == ['error-then-fix-pattern']
+
 
 class TestDeduplication:
     """Test deduplication against existing instincts."""
@@ -125,3 +203,36 @@ class TestRunLearnWithData:
 
         result = run_learn(obs_path, [], personal, execute=False)
         assert result == 0
+
+    def test_execute_writes_instinct_files(self, tmp_path):
+        obs_path = tmp_path / "observations.jsonl"
+        personal = tmp_path / "personal"
+        personal.mkdir()
+
+        observations = []
+        for session_num in range(3):
+            for tool in ['Grep', 'Read', 'Edit']:
+                observations.append({
+                    'session': f"session-{session_num}",
+                    'event': 'tool_start',
+                    'tool': tool,
+                })
+        _write_observations(obs_path, observations)
+
+        result = run_learn(obs_path, [], personal, execute=True)
+        assert result == 0
+
+        content = (personal / "workflow-grep-read-edit.yaml").read_text()
+        header, sep, body = content.partition("---\n\n")
+        assert sep
+        # Same layout instinct_decay rewrites, since both share its writer
+        assert [line.split(':', 1)[0] for line in header.splitlines()] == [
+            '---', 'id', 'trigger', 'confidence', 'domain', 'source',
+            'last_observed', 'observed_count',
+        ]
+        assert 'trigger: "when following Grep -> Read -> Edit workflow"' \
+            in header
+        assert "confidence: 0.50\n" in header
+        assert "source: auto-learned\n" in header
+        assert body == ("## Action\n\nPattern: repeated_workflow\n\n"
+                        "## Evidence\n\nSequence appeared 3 times\n")